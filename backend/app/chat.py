@@ -1,31 +1,35 @@
 import os
 import sys
 import json
+import time
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
+from functools import lru_cache
 from dotenv import load_dotenv
 
-# Add project root to PYTHONPATH
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Add project root (backend/) to PYTHONPATH so `app.*` resolves when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from crud import save_tables_to_json  # Import from crud.py
+from app.config import settings
+from app.intent_router import route_query
+from app.logging_config import setup_logging
 
 # Load environment variables
 load_dotenv()
 
 # Logging setup
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+setup_logging()
 logger = logging.getLogger("Chatbot")
 
-# Load OpenAI API key
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
-    raise ValueError("OpenAI API key is not set in the environment variables.")
+# Initialize GPT on first use, so importing this module needs no API key
+@lru_cache(maxsize=None)
+def get_llm():
+    from langchain_openai import ChatOpenAI
 
-# Initialize GPT
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.0, openai_api_key=openai_api_key)
+    if not settings.openai_api_key:
+        raise ValueError("OpenAI API key is not set in the environment variables.")
+    return ChatOpenAI(model="gpt-4o-mini", temperature=0.0, openai_api_key=settings.openai_api_key)
 
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -102,29 +106,48 @@ def load_conversation_history():
         logger.error(f"Error loading conversation history: {e}")
         return []
 
+# Prompt template shared by single and batch queries, built on first use
+@lru_cache(maxsize=None)
+def get_prompt_template():
+    from langchain.prompts import PromptTemplate
+
+    return PromptTemplate(
+        input_variables=["conversation_history", "user_query", "data"],
+        template="""You are an assistant. Provide concise answers based on the dataset provided.
+        Conversation History: {conversation_history}
+        User Query: "{user_query}"
+        JSON Data: {data}
+        Instructions:
+        - Respond concisely and clearly.""",
+    )
+
+# Encode the dataset once so it can be reused across several prompts
+def encode_data(loaded_data):
+    return json.dumps(loaded_data, indent=2)
+
+# Format the last few conversation turns for the prompt
+def format_conversation_history(conversation_history):
+    return "\n".join(
+        [f"User: {log['user_prompt']}\nBot: {log['bot_response']}" for log in conversation_history[-10:]]
+    )
+
 # Process user queries based on loaded JSON data
 def process_user_query(user_input, loaded_data):
     try:
-        conversation_history = load_conversation_history()
-        formatted_history = "\n".join(
-            [f"User: {log['user_prompt']}\nBot: {log['bot_response']}" for log in conversation_history[-10:]]
-        )
+        # Greetings, metadata questions and direct lookups are answered locally
+        _, routed_reply = route_query(user_input, loaded_data)
+        if routed_reply is not None:
+            save_conversation(user_input, routed_reply)
+            return routed_reply
 
-        prompt_template = PromptTemplate(
-            input_variables=["conversation_history", "user_query", "data"],
-            template="""You are an assistant. Provide concise answers based on the dataset provided.
-            Conversation History: {conversation_history}
-            User Query: "{user_query}"
-            JSON Data: {data}
-            Instructions:
-            - Respond concisely and clearly.""",
-        )
+        formatted_history = format_conversation_history(load_conversation_history())
+        encoded_data = encode_data(loaded_data)
 
-        prompt = prompt_template.format(
-            conversation_history=formatted_history, user_query=user_input, data=json.dumps(loaded_data, indent=2)
+        prompt = get_prompt_template().format(
+            conversation_history=formatted_history, user_query=user_input, data=encoded_data
         )
 
-        response = llm.invoke(prompt)
+        response = get_llm().invoke(prompt)
         bot_response = response.content if hasattr(response, "content") else str(response)
         save_conversation(user_input, bot_response)
         return bot_response.strip()
@@ -133,6 +156,73 @@ def process_user_query(user_input, loaded_data):
         logger.error(f"Error processing user query: {e}")
         return "Sorry, I encountered an error while processing your request."
 
+# Answer a batch of questions against one dataset, yielding results as they complete
+async def process_batch_queries(questions, loaded_data, max_concurrency=5):
+    """
+    Answer every question in `questions` against `loaded_data`.
+
+    The dataset is encoded once, identical questions are sent upstream only once,
+    and at most `max_concurrency` LLM calls run at the same time. Batch questions
+    are answered independently: they neither read nor write the conversation log.
+
+    Yields one dict per input question, in completion order, with keys index,
+    question, response, error, deduplicated, queue_ms (time spent waiting for a
+    concurrency slot) and elapsed_ms (time spent answering once a slot was held).
+    Closing the generator early cancels any questions still in flight.
+    """
+    # Encoding a large dataset is CPU-bound, so keep it off the event loop
+    encoded_data = await asyncio.to_thread(encode_data, loaded_data)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Map each distinct question to the input positions that asked it
+    positions = {}
+    for index, question in enumerate(questions):
+        positions.setdefault(question.strip(), []).append(index)
+
+    async def answer(question):
+        if not question:
+            return question, None, "Input cannot be empty", 0.0, 0.0
+        started = time.perf_counter()
+        try:
+            _, routed_reply = route_query(question, loaded_data)
+        except Exception as e:
+            logger.error(f"Error routing batch query {question!r}: {e}")
+            return question, None, str(e), 0.0, (time.perf_counter() - started) * 1000
+        if routed_reply is not None:
+            return question, routed_reply, None, 0.0, (time.perf_counter() - started) * 1000
+        queued = time.perf_counter()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                prompt = get_prompt_template().format(conversation_history="", user_query=question, data=encoded_data)
+                response = await get_llm().ainvoke(prompt)
+                bot_response = response.content if hasattr(response, "content") else str(response)
+                result, error = bot_response.strip(), None
+            except Exception as e:
+                logger.error(f"Error processing batch query {question!r}: {e}")
+                result, error = None, str(e)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        return question, result, error, (started - queued) * 1000, elapsed_ms
+
+    tasks = [asyncio.ensure_future(answer(question)) for question in positions]
+    try:
+        for task in asyncio.as_completed(tasks):
+            question, result, error, queue_ms, elapsed_ms = await task
+            for n, index in enumerate(positions[question]):
+                yield {
+                    "index": index,
+                    "question": questions[index],
+                    "response": result,
+                    "error": error,
+                    "queue_ms": round(queue_ms, 2),
+                    "elapsed_ms": round(elapsed_ms, 2),
+                    "deduplicated": n > 0,
+                }
+    finally:
+        # Stop upstream calls nobody will read, e.g. after a streaming client disconnects
+        for task in tasks:
+            task.cancel()
+
 # Display menu and get user choice
 def display_menu():
     print("\nWelcome to Square AI Energy Assistant!")
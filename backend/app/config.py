@@ -0,0 +1,47 @@
+import os
+
+
+class Settings:
+    """
+    Environment-backed settings.
+
+    Values are read from the environment when accessed rather than at import
+    time, so modules can be imported without credentials and a missing
+    variable only fails the code path that actually needs it.
+    """
+
+    @staticmethod
+    def _list(name):
+        value = os.getenv(name)
+        return [item.strip() for item in value.split(",")] if value else []
+
+    @property
+    def openai_api_key(self):
+        return os.getenv("OPENAI_API_KEY")
+
+    @property
+    def thingsboard_host(self):
+        return os.getenv("THINGSBOARD_HOST")
+
+    @property
+    def thingsboard_username(self):
+        return os.getenv("THINGSBOARD_USERNAME")
+
+    @property
+    def thingsboard_password(self):
+        return os.getenv("THINGSBOARD_PASSWORD")
+
+    @property
+    def thingsboard_data_keys(self):
+        return self._list("THINGSBOARD_DATA_KEY")
+
+    @property
+    def device_ids(self):
+        return self._list("DEVICE_IDS")
+
+    @property
+    def database_url(self):
+        return os.getenv("DATABASE_URL")
+
+
+settings = Settings()
@@ -1,36 +1,29 @@
 import os
-import requests
 from datetime import datetime, date, timedelta
 import pytz
 import logging
-import psycopg2
 import json
 from dotenv import load_dotenv
 from decimal import Decimal
 import uuid
 import time
+import sys
+
+# Add project root (backend/) to PYTHONPATH so `app.*` resolves when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.logging_config import setup_logging, summarize
+from app.config import settings
 
 
 # Load environment variables
 load_dotenv()
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-THINGSBOARD_HOST = os.getenv("THINGSBOARD_HOST")
-THINGSBOARD_DATA_KEYS = os.getenv("THINGSBOARD_DATA_KEY").split(',')
-THINGSBOARD_USERNAME = os.getenv("THINGSBOARD_USERNAME")
-THINGSBOARD_PASSWORD = os.getenv("THINGSBOARD_PASSWORD")
-DEVICE_IDS = os.getenv("DEVICE_IDS").split(',')
-
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT", 5432)
-DB_NAME = os.getenv("DB_NAME", "ael")  # fallback to 'ael' if not in .env
-
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
+# ThingsBoard credentials, device lists and DATABASE_URL are read lazily from `settings`
 
 # Define common JSON directory (New GB folder)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -43,9 +36,11 @@ MALAYSIA_TZ = pytz.timezone('Asia/Kuala_Lumpur')
 
 # Authenticate with ThingsBoard
 def authenticate():
+    import requests
+
     logger.info("Authenticating with ThingsBoard...")
-    url = f"{THINGSBOARD_HOST}/api/auth/login"
-    credentials = {"username": THINGSBOARD_USERNAME, "password": THINGSBOARD_PASSWORD}
+    url = f"{settings.thingsboard_host}/api/auth/login"
+    credentials = {"username": settings.thingsboard_username, "password": settings.thingsboard_password}
     headers = {"Content-Type": "application/json"}
 
     response = requests.post(url, json=credentials, headers=headers)
@@ -116,7 +111,7 @@ def save_tables_to_json():
     cursor = None
 
     try:
-        DATABASE_URL = os.getenv("DATABASE_URL")
+        DATABASE_URL = settings.database_url
         if not DATABASE_URL:
             raise ValueError("DATABASE_URL not set in environment variables.")
 
@@ -161,7 +156,9 @@ def convert_unix_to_malaysia_date(unix_timestamp):
 
 # Fetch telemetry data for a device and a period
 def fetch_telemetry_data(device_id, token, start_ts, end_ts, key):
-    url = f"{THINGSBOARD_HOST}/api/plugins/telemetry/DEVICE/{device_id}/values/timeseries"
+    import requests
+
+    url = f"{settings.thingsboard_host}/api/plugins/telemetry/DEVICE/{device_id}/values/timeseries"
     params = {"keys": key, "startTs": start_ts, "endTs": end_ts}
     headers = {"X-Authorization": f"Bearer {token}"}
 
@@ -173,7 +170,7 @@ def fetch_telemetry_data(device_id, token, start_ts, end_ts, key):
         return []
     
     data = response.json()
-    logger.info(f"Fetched telemetry data: {json.dumps(data, indent=2)}")
+    logger.debug("Fetched telemetry data for %s: %s", device_id, summarize(data))
 
     if not data or key not in data:
         return []
@@ -192,13 +189,19 @@ def fetch_device_data(device_id, token, key, start_ts, end_ts):
 # Fetch all devices' data
 def fetch_all_devices_data():
     try:
+        # Check configuration before spending a login round-trip
+        device_ids = settings.device_ids
+        data_keys = settings.thingsboard_data_keys
+        if not device_ids or len(data_keys) < len(device_ids):
+            raise ValueError("DEVICE_IDS and THINGSBOARD_DATA_KEY must be set with one data key per device.")
+
         token = authenticate()
         current_ts = int(datetime.now().timestamp() * 1000)
         start_ts = current_ts - (365 * 24 * 60 * 60 * 1000)  # Fetch data for the past year
 
         combined_results = {}
-        for i, device_id in enumerate(DEVICE_IDS):
-            key = THINGSBOARD_DATA_KEYS[i]
+        for i, device_id in enumerate(device_ids):
+            key = data_keys[i]
             block_name = f"Block {chr(65 + i)}"
             logger.info(f"Fetching data for {block_name}...")
             telemetry_data = fetch_device_data(device_id, token, key, start_ts, current_ts)
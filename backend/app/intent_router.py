@@ -0,0 +1,200 @@
+import re
+import time
+import logging
+
+from app.logging_config import summarize
+
+logger = logging.getLogger("IntentRouter")
+
+# Intents answered locally; everything else is escalated to the LLM
+GREETING = "greeting"
+METADATA = "metadata"
+LOOKUP = "lookup"
+ANALYTIC = "analytic"
+
+# Record fields that identify an entity, and how to describe it
+ENTITY_FIELDS = {
+    "chimneyID": "chimney",
+    "wasteCode": "waste code",
+}
+
+# Record fields that hold the date of a reading, in order of preference
+DATE_FIELDS = ("date", "measurementDate", "collectionDate", "discharge_date", "date_column")
+
+# Bookkeeping fields that are never shown in lookup replies
+HIDDEN_FIELDS = {"id", "createdAt", "updatedAt", "createdat", "created_at"}
+
+# Lookups matching more records than this without asking for the latest one are escalated
+MAX_LOOKUP_RECORDS = 5
+
+BLOCK_PATTERN = re.compile(r"^Block [A-Z]$")
+
+# Greetings, thanks and farewells, each matched as the whole message
+GREETING_REPLIES = [
+    (
+        re.compile(r"^\s*(hi|hello|hey|hiya|good (morning|afternoon|evening))( there)?\s*[!.?]*\s*$", re.IGNORECASE),
+        "Hello! I can answer questions about the selected dataset. What would you like to know?",
+    ),
+    (
+        re.compile(r"^\s*(thanks|thank you|thx)( (so|very) much)?\s*[!.]*\s*$", re.IGNORECASE),
+        "You're welcome! Let me know if you have any other questions.",
+    ),
+    (
+        re.compile(r"^\s*(bye|goodbye|see you)\s*[!.]*\s*$", re.IGNORECASE),
+        "Goodbye! Have a great day!",
+    ),
+]
+
+
+def _whole_question(pattern):
+    return re.compile(r"^\s*" + pattern + r"\s*[?.!]*\s*$", re.IGNORECASE)
+
+
+# Questions about the dataset itself, matched only as the whole question
+METADATA_PATTERNS = [
+    _whole_question(r"what (data|information|datasets?|records) (do|does) (you|this dataset|the dataset) (have|hold|contain)"),
+    _whole_question(r"what (data|information) is (available|loaded)"),
+    _whole_question(r"what can you (do|help( me)? with)"),
+    _whole_question(r"(which|what) (blocks|fields|columns|chimneys|waste codes) (are there|do you have|are available)"),
+    _whole_question(r"(describe|summari[sz]e) (the |this )?(data|dataset)"),
+]
+
+# Direct record lookups, matched only as the whole question; <entity> must be a known entity
+LOOKUP_TEMPLATES = [
+    (
+        "latest",
+        _whole_question(
+            r"((show|get|give|display|what is|what's|what was)( me)? )?(the )?(latest|last|most recent|newest) "
+            r"(reading|record|value|entry|collection|measurement)s? (for|of) (?P<entity>.+?)"
+        ),
+    ),
+    (
+        "all",
+        _whole_question(
+            r"(show|get|give|display|list)( me)?( the| all)?( (readings|records|entries|measurements) (for|of))? (?P<entity>.+?)"
+        ),
+    ),
+]
+
+# Small cache of entity indexes keyed by dataset identity; load_json in main.py
+# returns the same object until the file changes, so this hits across requests
+MAX_CACHED_INDEXES = 8
+_index_cache = {}
+
+
+# Return the date of a record, or an empty string if it has none
+def record_date(record):
+    for field in DATE_FIELDS:
+        if record.get(field):
+            return str(record[field])
+    return ""
+
+
+# Format a record as "field: value" pairs for a reply
+def format_record(record):
+    return ", ".join(f"{key}: {value}" for key, value in record.items() if key not in HIDDEN_FIELDS)
+
+
+# Split loaded data into named groups of records
+def iter_groups(loaded_data):
+    if isinstance(loaded_data, dict):
+        for name, records in loaded_data.items():
+            if isinstance(records, list):
+                yield name, [r for r in records if isinstance(r, dict)]
+    elif isinstance(loaded_data, list):
+        yield None, [r for r in loaded_data if isinstance(r, dict)]
+
+
+# Build an index of known entities (block names, waste codes, chimney IDs) to their records
+def build_index(loaded_data):
+    entities = {}
+    for name, records in iter_groups(loaded_data):
+        if name and BLOCK_PATTERN.match(name):
+            entities[name.lower()] = (name, records)
+        for record in records:
+            for field in ENTITY_FIELDS:
+                value = record.get(field)
+                if value:
+                    entities.setdefault(str(value).lower(), (str(value), []))[1].append(record)
+    return entities
+
+
+def get_index(loaded_data):
+    # The cached entry keeps a reference to the data so its id cannot be reused
+    cached = _index_cache.get(id(loaded_data))
+    if cached is not None and cached[0] is loaded_data:
+        return cached[1]
+    if len(_index_cache) >= MAX_CACHED_INDEXES:
+        _index_cache.pop(next(iter(_index_cache)))
+    index = build_index(loaded_data)
+    _index_cache[id(loaded_data)] = (loaded_data, index)
+    return index
+
+
+# Describe what the loaded dataset contains
+def describe_data(loaded_data):
+    parts = []
+    for name, records in iter_groups(loaded_data):
+        dates = sorted(d for d in map(record_date, records) if d)
+        summary = f"{len(records)} records"
+        if dates:
+            summary += f" from {dates[0]} to {dates[-1]}"
+        parts.append(f"{name}: {summary}" if name else summary)
+    if not parts:
+        return "No data is currently loaded for this category."
+    return "This dataset contains " + "; ".join(parts) + "."
+
+
+# Answer a question that matches a lookup template for one known entity, or return None
+def answer_lookup(user_input, index):
+    for kind, pattern in LOOKUP_TEMPLATES:
+        match = pattern.match(user_input)
+        if match:
+            break
+    else:
+        return None, None
+
+    entry = index.get(match.group("entity").strip().lower())
+    if entry is None:
+        return None, None
+    label, records = entry
+    if not records:
+        return label, f"There are no records for {label}."
+    records = sorted(records, key=record_date)
+
+    if kind == "latest":
+        return label, f"Latest record for {label}: {format_record(records[-1])}."
+    if len(records) <= MAX_LOOKUP_RECORDS:
+        lines = "\n".join(f"- {format_record(record)}" for record in records)
+        return label, f"Records for {label}:\n{lines}"
+    return label, None
+
+
+def route_query(user_input, loaded_data):
+    """
+    Classify `user_input` with cheap local rules before it reaches the LLM.
+
+    Greetings, questions about what data is available, and direct record
+    lookups for a single known block, waste code or chimney are answered from
+    templates and an entity index. Only questions that match a template as a
+    whole are answered locally; everything else is escalated. Returns
+    (intent, reply); reply is None when the query should be escalated to the model.
+    """
+    started = time.perf_counter()
+    intent, entity, reply = ANALYTIC, None, None
+    greeting_reply = next((reply for pattern, reply in GREETING_REPLIES if pattern.match(user_input)), None)
+
+    if greeting_reply is not None:
+        intent, reply = GREETING, greeting_reply
+    elif any(pattern.match(user_input) for pattern in METADATA_PATTERNS):
+        intent, reply = METADATA, describe_data(loaded_data)
+    else:
+        entity, reply = answer_lookup(user_input, get_index(loaded_data))
+        if reply is not None:
+            intent = LOOKUP
+
+    logger.info(
+        "Routed query: intent=%s entity=%s escalated=%s elapsed_ms=%.3f query=%s",
+        intent, entity, reply is None, (time.perf_counter() - started) * 1000, summarize(user_input),
+    )
+    return intent, reply
@@ -0,0 +1,252 @@
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+
+# Settings problems found while parsing the environment, logged once logging is up
+_config_warnings = []
+
+
+def _int_env(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        _config_warnings.append(f"Ignoring invalid {name}={value!r}, using {default}")
+        return default
+
+
+# Default limits for payloads and whole messages written to the log
+MAX_PAYLOAD_CHARS = _int_env("LOG_MAX_PAYLOAD_CHARS", 500)
+MAX_MESSAGE_CHARS = _int_env("LOG_MAX_MESSAGE_CHARS", 2000)
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+
+
+def _preview(value, limit):
+    """
+    Render roughly `limit` characters of `value` without serializing the rest.
+
+    Returns (text, complete); complete is False when anything was left out.
+    """
+    if isinstance(value, dict):
+        items = ((f"{key!r}: ", item) for key, item in value.items())
+        opener, closer = "{", "}"
+    elif isinstance(value, (list, tuple)):
+        items = (("", item) for item in value)
+        opener, closer = "[", "]"
+    elif isinstance(value, str):
+        return repr(value[:limit]), len(value) <= limit
+    else:
+        text = repr(value)
+        return text[:limit], len(text) <= limit
+
+    parts, used, complete, skipped = [], 0, True, False
+    for prefix, item in items:
+        if used >= limit:
+            skipped = True
+            break
+        text, item_complete = _preview(item, limit - used)
+        parts.append(prefix + text)
+        used += len(prefix) + len(text) + 2
+        complete = complete and item_complete
+    return opener + ", ".join(parts) + (", ..." if skipped else "") + closer, complete and not skipped
+
+
+class PayloadSummary:
+    """
+    Lazy, size-bounded view of a log payload.
+
+    Nothing is rendered for records dropped by level or sampling. Accepted
+    records render only a bounded preview plus the payload's size, so the cost
+    does not grow with the payload.
+    """
+
+    def __init__(self, payload, limit=None):
+        self.payload = payload
+        self.limit = limit or MAX_PAYLOAD_CHARS
+
+    def __str__(self):
+        payload = self.payload
+        if isinstance(payload, str):
+            if len(payload) <= self.limit:
+                return payload
+            return f"{payload[:self.limit]}... ({len(payload)} chars)"
+        text, complete = _preview(payload, self.limit)
+        if complete:
+            return text
+        size = f"{len(payload)} items, " if isinstance(payload, (dict, list, tuple)) else ""
+        return f"{text} ({size}{type(payload).__name__})"
+
+    __repr__ = __str__
+
+
+def summarize(payload, limit=None):
+    return PayloadSummary(payload, limit)
+
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line: time, level, logger, message and any `extra` fields
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": str(summarize(record.getMessage(), MAX_MESSAGE_CHARS)),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that renders only the records it accepts.
+
+    Filtered-out records never reach prepare(). Accepted records have their
+    message and traceback rendered here, on the logging thread, so the log
+    shows arguments as they were at call time and no live traceback is kept.
+    JSON encoding and writing still happen on the writer thread.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records from selected high-volume loggers."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.name)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < rate
+
+
+# Resolve a level name such as "debug" or "20", or None if it is not a level
+def _parse_level(value):
+    value = value.strip().upper()
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value)
+    return level if isinstance(level, int) else None
+
+
+# Parse a sample rate between 0 and 1, or None if it is not one
+def _parse_rate(value):
+    try:
+        rate = float(value)
+    except ValueError:
+        return None
+    return rate if 0.0 <= rate <= 1.0 else None
+
+
+# Parse "name=value,name=value" settings from an environment variable
+def _parse_pairs(value):
+    pairs = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, setting = item.split("=", 1)
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+def setup_logging():
+    """
+    Route all logging through a queue to a background writer thread.
+
+    Configured from the environment:
+    - LOG_LEVEL: root level (default INFO)
+    - LOG_LEVELS: per-logger levels, e.g. "SquareCloudAI=DEBUG,app.crud=WARNING"
+    - LOG_SAMPLE: per-logger sample rates for records below WARNING, e.g. "IntentRouter=0.1"
+    - LOG_FILE: optional file to write to in addition to stderr
+
+    Invalid values are skipped with a warning rather than failing the import.
+    Safe to call more than once; only the first call installs handlers.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if os.getenv("LOG_FILE"):
+        handlers.append(logging.FileHandler(os.getenv("LOG_FILE")))
+    formatter = JsonFormatter()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    rates = {}
+    for name, value in _parse_pairs(os.getenv("LOG_SAMPLE")).items():
+        rate = _parse_rate(value)
+        if rate is None:
+            _config_warnings.append(f"Ignoring invalid LOG_SAMPLE rate {name}={value!r}; expected 0 to 1")
+        else:
+            rates[name] = rate
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root_level = _parse_level(os.getenv("LOG_LEVEL", "INFO"))
+    if root_level is None:
+        _config_warnings.append(f"Ignoring invalid LOG_LEVEL={os.getenv('LOG_LEVEL')!r}, using INFO")
+        root_level = logging.INFO
+    root.setLevel(root_level)
+    for name, value in _parse_pairs(os.getenv("LOG_LEVELS")).items():
+        level = _parse_level(value)
+        if level is None:
+            _config_warnings.append(f"Ignoring invalid LOG_LEVELS entry {name}={value!r}")
+        else:
+            logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    logger = logging.getLogger(__name__)
+    for warning in _config_warnings:
+        logger.warning(warning)
+    _config_warnings.clear()
+
+
+def shutdown_logging():
+    # Flush queued records and stop the writer thread
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,83 @@
+"""
+Measure cold-start import time for the API and the CLI against a budget.
+
+Each target is imported in a fresh interpreter, from a temporary copy of the
+backend with no .env file and with credentials removed from the environment,
+so this also checks that imports stay free of clients and env lookups. Run
+from anywhere:
+
+    python backend/check_startup.py
+
+Exits non-zero if the median import time of any target exceeds its budget.
+Budgets (seconds) can be overridden with STARTUP_BUDGET_API / STARTUP_BUDGET_CLI.
+tests/test_startup.py runs the same check when RUN_STARTUP_BUDGET=1 is set.
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (directory relative to backend/, module to import, budget in seconds)
+TARGETS = {
+    "api": ("", "main", float(os.getenv("STARTUP_BUDGET_API", 1.5))),
+    "cli": ("app", "chat", float(os.getenv("STARTUP_BUDGET_CLI", 0.5))),
+}
+
+RUNS = int(os.getenv("STARTUP_RUNS", 5))
+
+# Credentials that must not be needed just to import a module
+CREDENTIAL_VARS = (
+    "OPENAI_API_KEY",
+    "THINGSBOARD_HOST",
+    "THINGSBOARD_DATA_KEY",
+    "THINGSBOARD_USERNAME",
+    "THINGSBOARD_PASSWORD",
+    "DEVICE_IDS",
+    "DATABASE_URL",
+)
+
+
+def clean_env():
+    env = {key: value for key, value in os.environ.items() if key not in CREDENTIAL_VARS}
+    # Stop load_dotenv() from pulling credentials back in from a .env file
+    env["PYTHON_DOTENV_DISABLED"] = "1"
+    return env
+
+
+def time_import(cwd, module, env):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=cwd, env=env, check=True)
+    return time.perf_counter() - started
+
+
+def measure(runs=RUNS):
+    """Return (name, module, median seconds, budget seconds) for each target."""
+    env = clean_env()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # A copy without .env files, for python-dotenv versions that ignore PYTHON_DOTENV_DISABLED
+        backend = os.path.join(tmp, "backend")
+        shutil.copytree(BASE_DIR, backend, ignore=shutil.ignore_patterns(".env", "__pycache__", "tests"))
+        for name, (subdir, module, budget) in TARGETS.items():
+            cwd = os.path.join(backend, subdir)
+            timings = [time_import(cwd, module, env) for _ in range(runs)]
+            results.append((name, module, statistics.median(timings), budget))
+    return results
+
+
+def main():
+    failed = False
+    for name, module, median, budget in measure():
+        status = "ok" if median <= budget else "OVER BUDGET"
+        print(f"{name}: import {module} median {median:.3f}s over {RUNS} runs (budget {budget:.3f}s) {status}")
+        failed = failed or median > budget
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
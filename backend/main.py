@@ -3,14 +3,18 @@ import json
 import logging
 import tempfile
 from datetime import datetime
+from functools import lru_cache
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from openai import OpenAI, OpenAIError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
-from app.chat import process_user_query, clear_conversation_log
+from app.chat import process_user_query, process_batch_queries, clear_conversation_log
+from app.logging_config import setup_logging, summarize
+from app.config import settings
 from app.crud import (
     update_combined_data,
     save_tables_to_json,
@@ -19,18 +23,20 @@ from app.crud import (
 )
 
 # -------------------------------------------------------------------------
-# Load environment and configure OpenAI client
+# Load environment; the OpenAI client is created on first use
 # -------------------------------------------------------------------------
 load_dotenv()
-client = OpenAI()  # reads OPENAI_API_KEY from environment
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    from openai import OpenAI
+
+    return OpenAI(api_key=settings.openai_api_key)
 
 # -------------------------------------------------------------------------
 # Logging setup
 # -------------------------------------------------------------------------
-logging.basicConfig(
-    format="%(asctime)s %(levelname)s %(message)s",
-    level=logging.DEBUG,  # use DEBUG to see all our log lines
-)
+setup_logging()  # queued JSON logging; levels and sampling via LOG_LEVEL / LOG_LEVELS / LOG_SAMPLE
 logger = logging.getLogger("SquareCloudAI")
 
 # -------------------------------------------------------------------------
@@ -81,6 +87,14 @@ class ChatRequest(BaseModel):
 class CategorySelection(BaseModel):
     category: str
 
+MAX_BATCH_QUESTIONS = 100
+
+class BatchChatRequest(BaseModel):
+    category: str
+    questions: list[str]
+    max_concurrency: int = Field(5, ge=1, le=16)
+    stream: bool = False
+
 # -------------------------------------------------------------------------
 # In-memory session state
 # -------------------------------------------------------------------------
@@ -109,10 +123,22 @@ def on_shutdown():
 # -------------------------------------------------------------------------
 # Helper: Load JSON from GB_DIR
 # -------------------------------------------------------------------------
+# path -> ((mtime_ns, size), data); reloaded only when the sync job rewrites the file.
+# The same object is returned on every hit, so callers must not mutate it.
+_json_cache = {}
+
 def load_json(filename: str):
     path = os.path.join(GB_DIR, filename)
     try:
-        return json.load(open(path, "r"))
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = _json_cache.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with open(path, "r") as f:
+            data = json.load(f)
+        _json_cache[path] = (version, data)
+        return data
     except Exception:
         logger.exception("Error loading JSON %s, returning empty dict", filename)
         return {}
@@ -123,8 +149,9 @@ def load_json(filename: str):
 @app.post("/transcribe-openai/")
 async def transcribe_audio(file: UploadFile = File(...)):
     logger.info(f"Transcribe request: filename={file.filename}, content_type={file.content_type}")
-    if not client.api_key:
+    if not settings.openai_api_key:
         raise HTTPException(500, detail="OPENAI_API_KEY not set")
+    from openai import OpenAIError
 
     name, ext = os.path.splitext(file.filename.lower())
     supported = {".flac", ".m4a", ".mp3", ".mp4", ".mpeg", ".mpga", ".oga", ".ogg", ".wav", ".webm"}
@@ -139,11 +166,11 @@ async def transcribe_audio(file: UploadFile = File(...)):
 
         # whisper transcription
         with open(tmp_path, "rb") as audio_file:
-            resp = client.audio.transcriptions.create(model="whisper-1", file=audio_file)
+            resp = get_openai_client().audio.transcriptions.create(model="whisper-1", file=audio_file)
 
         os.unlink(tmp_path)
         transcription = getattr(resp, "text", "") or ""
-        logger.debug("Whisper returned transcription: %r", transcription)
+        logger.debug("Whisper returned transcription: %s", summarize(transcription))
         return {"transcription": transcription}
 
     except OpenAIError as e:
@@ -173,7 +200,7 @@ def select_category(req: CategorySelection):
 # -------------------------------------------------------------------------
 @app.post("/chat/")
 def chat(req: ChatRequest, background_tasks: BackgroundTasks):
-    logger.info("Chat request: user_input=%r, selected_category=%r", req.user_input, selected_category)
+    logger.info("Chat request: user_input=%s, selected_category=%r", summarize(req.user_input), selected_category)
     if not req.user_input.strip():
         raise HTTPException(400, detail="Input cannot be empty")
     if not selected_category:
@@ -182,7 +209,7 @@ def chat(req: ChatRequest, background_tasks: BackgroundTasks):
     data = load_json(DATA_OPTIONS[selected_category])
     try:
         reply = process_user_query(req.user_input, data)
-        logger.debug("process_user_query returned: %r", reply)
+        logger.debug("process_user_query returned: %s", summarize(reply))
         if not reply:
             reply = "I’m sorry, I don’t have an answer for that."
         return {"response": reply, "timestamp": datetime.utcnow().isoformat()}
@@ -190,6 +217,38 @@ def chat(req: ChatRequest, background_tasks: BackgroundTasks):
         logger.exception("Error processing chat")
         raise HTTPException(500, detail="Chat processing failed")
 
+# -------------------------------------------------------------------------
+# Batch chat endpoint
+# -------------------------------------------------------------------------
+@app.post("/chat/batch/")
+async def chat_batch(req: BatchChatRequest):
+    cat = req.category.lower()
+    logger.info("Batch chat request: %d questions, category=%r, stream=%r", len(req.questions), cat, req.stream)
+    if cat not in DATA_OPTIONS:
+        raise HTTPException(400, detail="Invalid category")
+    if not req.questions:
+        raise HTTPException(400, detail="Questions cannot be empty")
+    if len(req.questions) > MAX_BATCH_QUESTIONS:
+        raise HTTPException(400, detail=f"At most {MAX_BATCH_QUESTIONS} questions per batch")
+
+    data = await run_in_threadpool(load_json, DATA_OPTIONS[cat])
+    results = process_batch_queries(req.questions, data, req.max_concurrency)
+
+    if req.stream:
+        # one JSON object per line, emitted as each answer completes
+        async def stream_results():
+            try:
+                async for item in results:
+                    yield json.dumps(item) + "\n"
+            finally:
+                # cancels pending upstream calls if the client goes away
+                await results.aclose()
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    items = [item async for item in results]
+    items.sort(key=lambda item: item["index"])
+    return {"category": cat, "results": items, "timestamp": datetime.utcnow().isoformat()}
+
 # -------------------------------------------------------------------------
 # Health check and log management
 # -------------------------------------------------------------------------
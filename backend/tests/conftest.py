@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the backend directory importable so tests can use `app.*` like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
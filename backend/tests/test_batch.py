@@ -0,0 +1,126 @@
+import json
+import types
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import app.chat as chat
+
+
+class FakeLLM:
+    """Stub LLM that echoes the question and records how it was called."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.cancelled = 0
+
+    async def ainvoke(self, prompt):
+        self.calls.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        if "fail" in prompt:
+            raise RuntimeError("upstream failed")
+        return types.SimpleNamespace(content=f"answer to {prompt}")
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(chat, "get_llm", lambda: fake)
+    # The stub prompt is just the question, so replies and errors can be matched to it
+    monkeypatch.setattr(chat, "get_prompt_template", lambda: types.SimpleNamespace(format=lambda **kw: kw["user_query"]))
+    return fake
+
+
+def run_batch(questions, data, max_concurrency=5):
+    async def collect():
+        return [item async for item in chat.process_batch_queries(questions, data, max_concurrency)]
+
+    return asyncio.run(collect())
+
+
+def test_concurrency_is_capped(llm):
+    questions = [f"trend for q{i}" for i in range(8)]
+    results = run_batch(questions, {}, max_concurrency=3)
+    assert len(results) == 8
+    assert llm.peak == 3
+    assert all(item["error"] is None for item in results)
+
+
+def test_identical_questions_call_upstream_once(llm):
+    results = run_batch(["trend for q1", "trend for q1", " trend for q1 "], {})
+    assert len(llm.calls) == 1
+    assert sorted(item["index"] for item in results) == [0, 1, 2]
+    assert sum(item["deduplicated"] for item in results) == 2
+    assert {item["response"] for item in results} == {"answer to trend for q1"}
+
+
+def test_per_item_errors_do_not_fail_the_batch(llm, monkeypatch):
+    def broken_route(question, data):
+        if "broken" in question:
+            raise KeyError("odd record")
+        return "analytic", None
+
+    monkeypatch.setattr(chat, "route_query", broken_route)
+    results = {item["question"]: item for item in run_batch(["trend ok", "please fail", "broken one", ""], {})}
+    assert results["trend ok"]["response"] == "answer to trend ok"
+    assert results["please fail"]["error"] == "upstream failed"
+    assert "odd record" in results["broken one"]["error"]
+    assert results[""]["error"] == "Input cannot be empty"
+
+
+def test_closing_early_cancels_in_flight_calls(llm):
+    async def first_then_close():
+        results = chat.process_batch_queries([f"trend for q{i}" for i in range(6)], {}, 2)
+        first = await results.__anext__()
+        await results.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    assert asyncio.run(first_then_close())["error"] is None
+    assert llm.cancelled >= 1
+    assert llm.active == 0
+
+
+def test_batch_endpoint_returns_results_in_order(llm):
+    client = TestClient(main.app)
+    questions = ["trend for q1", "hi", "trend for q1", "please fail"]
+    response = client.post("/chat/batch/", json={"category": "energy", "questions": questions})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3]
+    assert [item["question"] for item in results] == questions
+    assert results[1]["response"].startswith("Hello!")
+    assert results[3]["error"] == "upstream failed"
+    assert len(llm.calls) == 2
+
+
+def test_batch_endpoint_streams_ndjson(llm):
+    client = TestClient(main.app)
+    response = client.post(
+        "/chat/batch/", json={"category": "energy", "questions": ["trend for q1", "hi"], "stream": True}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in items) == [0, 1]
+
+
+def test_batch_endpoint_rejects_bad_requests():
+    client = TestClient(main.app)
+    assert client.post("/chat/batch/", json={"category": "nope", "questions": ["hi"]}).status_code == 400
+    assert client.post("/chat/batch/", json={"category": "energy", "questions": []}).status_code == 400
+    too_many = ["hi"] * (main.MAX_BATCH_QUESTIONS + 1)
+    assert client.post("/chat/batch/", json={"category": "energy", "questions": too_many}).status_code == 400
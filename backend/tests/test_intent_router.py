@@ -0,0 +1,104 @@
+import os
+import json
+import logging
+
+import pytest
+
+from app.intent_router import route_query, ANALYTIC, GREETING, LOOKUP, METADATA
+
+GB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "GB")
+
+
+def load_fixture(file_name):
+    with open(os.path.join(GB_DIR, file_name), "r") as file:
+        return json.load(file)
+
+
+ENERGY = "combined_data.json"
+WASTE = "waste_combined.json"
+CHIMNEY = "chimney_emissions.json"
+
+
+@pytest.mark.parametrize(
+    "file_name, query, expected_intent, expected_reply",
+    [
+        # greetings, thanks and farewells get their own replies
+        (ENERGY, "hi", GREETING, "Hello!"),
+        (ENERGY, "Good morning!", GREETING, "Hello!"),
+        (ENERGY, "thanks", GREETING, "You're welcome!"),
+        (ENERGY, "Thank you!", GREETING, "You're welcome!"),
+        (ENERGY, "bye", GREETING, "Goodbye!"),
+        (ENERGY, "goodbye", GREETING, "Goodbye!"),
+        # whole-question metadata
+        (ENERGY, "what data do you have", METADATA, "This dataset contains Block A"),
+        (WASTE, "What data do you have?", METADATA, "This dataset contains hazardous_waste"),
+        (CHIMNEY, "what can you do?", METADATA, "This dataset contains"),
+        (ENERGY, "Which blocks are there?", METADATA, "This dataset contains"),
+        (ENERGY, "describe the data", METADATA, "This dataset contains"),
+        # single-entity lookups
+        (ENERGY, "show the latest reading for Block A", LOOKUP, "Latest record for Block A"),
+        (ENERGY, "What was the last reading of Block C?", LOOKUP, "Latest record for Block C"),
+        (WASTE, "latest record for sw410", LOOKUP, "Latest record for SW410"),
+        (CHIMNEY, "show CH-013", LOOKUP, "Records for CH-013"),
+        (CHIMNEY, "Show me the records for CH-014.", LOOKUP, "Records for CH-014"),
+        (WASTE, "What's the most recent collection of SW410?", LOOKUP, "Latest record for SW410"),
+    ],
+)
+def test_answered_locally(file_name, query, expected_intent, expected_reply):
+    intent, reply = route_query(query, load_fixture(file_name))
+    assert intent == expected_intent
+    assert reply.startswith(expected_reply)
+
+
+@pytest.mark.parametrize(
+    "file_name, query",
+    [
+        # analytic questions that mention metadata words
+        (ENERGY, "Which blocks used the most energy last month?"),
+        (ENERGY, "what blocks exceeded 7000 kWh?"),
+        (WASTE, "Which waste codes exceed 40 tonnes?"),
+        (ENERGY, "Describe the data trend for Block A"),
+        (ENERGY, "What information do you have on peak hours?"),
+        (CHIMNEY, "what can you do to reduce CH-013 emissions?"),
+        # time windows are not "latest" lookups
+        (ENERGY, "What did Block A consume last month?"),
+        (ENERGY, "show Block A usage for last week"),
+        (ENERGY, "what was the reading for Block B yesterday"),
+        (ENERGY, "show Block A readings in January"),
+        # more than one entity
+        (ENERGY, "What was the last reading of Block A and Block B?"),
+        (CHIMNEY, "compare CH-013 and CH-014"),
+        # analytic questions phrased around a single record
+        (ENERGY, "Is there an anomaly in the latest reading of Block A?"),
+        (ENERGY, "Is Block A's latest reading normal?"),
+        (ENERGY, "Did Block A's latest reading go up?"),
+        (ENERGY, "Should we be worried about the latest Block A reading?"),
+        (WASTE, "what is the latest collection of SW410 and is it hazardous?"),
+        (CHIMNEY, "show me CH-013 emissions, are they within limits"),
+        # plain analytic questions and unknown entities
+        (ENERGY, "what is the total energy for Block B"),
+        (ENERGY, "show the latest reading for Block Z"),
+        (ENERGY, "show Block A"),
+        (WASTE, "thanks, and what is the average quantity?"),
+    ],
+)
+def test_escalated_to_model(file_name, query):
+    assert route_query(query, load_fixture(file_name)) == (ANALYTIC, None)
+
+
+def test_routing_log_includes_query(caplog):
+    with caplog.at_level(logging.INFO, logger="IntentRouter"):
+        route_query("trend for Block A", load_fixture(ENERGY))
+    assert "query=trend for Block A" in caplog.text
+
+
+def test_index_is_reused_while_the_file_is_unchanged(monkeypatch):
+    import main
+    from app import intent_router
+
+    built = []
+    original = intent_router.build_index
+    monkeypatch.setattr(intent_router, "build_index", lambda data: built.append(1) or original(data))
+    for _ in range(3):
+        route_query("show the latest reading for Block A", main.load_json(ENERGY))
+    assert len(built) <= 1
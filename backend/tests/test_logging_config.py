@@ -0,0 +1,72 @@
+import sys
+import queue
+import logging
+
+from app.logging_config import LazyQueueHandler, SamplingFilter, summarize, _parse_level, _parse_rate
+
+
+def make_record(msg, args, exc_info=None, name="test", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+
+
+def test_prepare_snapshots_args_at_call_time():
+    handler = LazyQueueHandler(queue.SimpleQueue())
+    payload = {"a": 1}
+    prepared = handler.prepare(make_record("mut %s", (payload,)))
+    payload["a"] = 2
+    assert prepared.getMessage() == "mut {'a': 1}"
+    assert prepared.args is None
+
+
+def test_prepare_renders_and_drops_traceback():
+    handler = LazyQueueHandler(queue.SimpleQueue())
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        prepared = handler.prepare(make_record("boom", None, sys.exc_info()))
+    assert prepared.exc_info is None
+    assert "ZeroDivisionError" in prepared.exc_text
+
+
+def test_invalid_settings_are_rejected():
+    assert _parse_level("debug") == logging.DEBUG
+    assert _parse_level("15") == 15
+    assert _parse_level("loud") is None
+    assert _parse_rate("0.25") == 0.25
+    assert _parse_rate("abc") is None
+    assert _parse_rate("2") is None
+
+
+class CountingRepr:
+    renders = 0
+
+    def __repr__(self):
+        CountingRepr.renders += 1
+        return "item"
+
+
+def test_summarize_keeps_small_payloads_whole():
+    assert str(summarize({"a": 1, "b": [1, 2]})) == "{'a': 1, 'b': [1, 2]}"
+    assert str(summarize("short")) == "short"
+
+
+def test_summarize_truncates_long_strings():
+    assert str(summarize("x" * 30, 10)) == "xxxxxxxxxx... (30 chars)"
+
+
+def test_summarize_previews_large_payloads_without_rendering_them():
+    CountingRepr.renders = 0
+    payload = {"power": [CountingRepr() for _ in range(100000)]}
+    text = str(summarize(payload, 100))
+    assert len(text) < 200
+    assert text.endswith("(1 items, dict)")
+    assert CountingRepr.renders < 50
+
+
+def test_sampling_filter():
+    dropped = SamplingFilter({"noisy": 0.0})
+    kept = SamplingFilter({"noisy": 1.0})
+    assert not dropped.filter(make_record("x", None, name="noisy"))
+    assert dropped.filter(make_record("x", None, name="noisy", level=logging.WARNING))
+    assert dropped.filter(make_record("x", None, name="other"))
+    assert kept.filter(make_record("x", None, name="noisy"))
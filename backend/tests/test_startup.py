@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+from check_startup import measure
+
+
+# Wall-clock timing is noisy on shared runners, so this only runs on request;
+# `python backend/check_startup.py` is the standard way to check the budget.
+@pytest.mark.skipif(not os.getenv("RUN_STARTUP_BUDGET"), reason="set RUN_STARTUP_BUDGET=1 to check startup time")
+def test_imports_need_no_credentials_and_fit_budget():
+    results = measure(runs=3)
+    over = [f"{name}: {median:.3f}s > {budget:.3f}s" for name, _, median, budget in results if median > budget]
+    if over:
+        pytest.fail("startup over budget: " + "; ".join(over))